@@ -1,16 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import pickle
 import os
-import plotly.graph_objects as go
-
-# Optional loaders
-try:
-    from tensorflow.keras.models import load_model as keras_load_model
-    KERAS_AVAILABLE = True
-except Exception:
-    KERAS_AVAILABLE = False
+import math
 
+# Optional loaders (tensorflow is imported lazily in load_trained_model)
 try:
     import joblib
     JOBLIB_AVAILABLE = True
@@ -25,7 +20,7 @@ st.set_page_config(page_title="Room Cancellation Predictor",
 
 
 # ------------------ CSS THEME (UI FIXED) ------------------
-st.markdown("""
+CSS = """
 <style>
 
 html, body, [data-testid="stAppViewContainer"] {
@@ -153,7 +148,8 @@ table {
 }
 
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CSS, unsafe_allow_html=True)
 
 
 # ------------------ PATHS ------------------
@@ -162,14 +158,14 @@ PREPROC_PATH = "/mnt/data/preprocessor.pkl"
 
 
 # ------------------ LOADERS ------------------
-@st.cache_data
+@st.cache_resource
 def load_preprocessor(path=PREPROC_PATH):
     if os.path.exists(path):
         try:
             with open(path, "rb") as f:
                 return pickle.load(f)
         except:
-            st.warning("Preprocessor failed to load.")
+            pass
     return None
 
 
@@ -178,8 +174,9 @@ def load_trained_model(path=MODEL_PATH):
     if not os.path.exists(path):
         return None
 
-    if path.lower().endswith(".h5") and KERAS_AVAILABLE:
+    if path.lower().endswith(".h5"):
         try:
+            from tensorflow.keras.models import load_model as keras_load_model
             return ("keras", keras_load_model(path))
         except:
             pass
@@ -198,12 +195,33 @@ def load_trained_model(path=MODEL_PATH):
 
 
 # ------------------ HEURISTIC ------------------
+def heuristic_predict_vec(df):
+    score = 0.45*(df["lead_time"].to_numpy()/365) + \
+            0.25*(df["previous_cancellations"].to_numpy()>0) + \
+            0.15*(df["deposit_type"].to_numpy()=="No Deposit") + \
+            0.15*(df["booking_changes"].to_numpy()>2)
+    return np.clip(score, 0, 0.99)
+
+
 def heuristic_predict(row):
-    score = 0.45*(row["lead_time"]/365) + \
-            0.25*(1 if row["previous_cancellations"]>0 else 0) + \
-            0.15*(1 if row["deposit_type"]=="No Deposit" else 0) + \
-            0.15*(1 if row["booking_changes"]>2 else 0)
-    return min(max(score,0),0.99)
+    return float(heuristic_predict_vec(pd.DataFrame([row]))[0])
+
+
+# ------------------ GAUGE ------------------
+def _gauge_svg(prob):
+    r = 38
+    circ = 2 * math.pi * r
+    return f"""
+<div style="text-align:center;">
+<svg viewBox="0 0 100 100" width="230" height="230">
+    <circle cx="50" cy="50" r="{r}" fill="none" stroke="#10b981" stroke-width="16"/>
+    <circle cx="50" cy="50" r="{r}" fill="none" stroke="#ef4444" stroke-width="16"
+            stroke-dasharray="{prob*circ:.2f} {circ:.2f}" transform="rotate(-90 50 50)"/>
+    <text x="50" y="50" text-anchor="middle" dominant-baseline="central"
+          font-size="16" fill="#0f172a">{prob:.0%}</text>
+</svg>
+</div>
+"""
 
 
 # ------------------ HEADER ------------------
@@ -215,110 +233,114 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# ------------------ WARM LOADERS ------------------
+# Load before the form renders so the first Predict doesn't pay for it.
+# If the .h5 model exists this imports tensorflow on the first page view.
+pre = load_preprocessor()
+model_info = load_trained_model()
+
+
 # ------------------ LAYOUT ------------------
-col_left, col_right = st.columns([2, 1])
-
-# ------------------ LEFT: FORM ------------------
-with col_left:
-    st.markdown('<div class="panel">', unsafe_allow_html=True)
-    st.subheader("Booking details")
-
-    with st.form("predict_form"):
-        c1, c2 = st.columns(2)
-        with c1:
-            lead_time = st.number_input("Lead time (days)", 0, 2000, 30)
-            weekend = st.number_input("Weekend nights", 0, 30, 0)
-            week = st.number_input("Week nights", 0, 365, 2)
-        with c2:
-            prev_cancel = st.number_input("Previous cancellations", 0, 50, 0)
-            changes = st.number_input("Booking changes", 0, 50, 0)
-            deposit = st.selectbox("Deposit type", ["No Deposit","Refundable","Non Refund"])
-
-        g1, g2 = st.columns(2)
-        with g1:
-            adults = st.number_input("Adults", 0, 10, 2)
-            children = st.number_input("Children", 0, 10, 0)
-        with g2:
-            segment = st.selectbox("Market segment",
-                                   ["Direct","Online TA","Offline TA/TO","Groups","Corporate","Complementary","Aviation"])
-
-        submit = st.form_submit_button("Predict")
-
-    st.markdown("</div>", unsafe_allow_html=True)
-
-
-# ------------------ RIGHT: RESULT PANEL ------------------
-with col_right:
-    st.markdown('<div class="panel">', unsafe_allow_html=True)
-    st.subheader("Prediction")
-
-    if submit:
-        row = {
-            "lead_time": int(lead_time),
-            "stays_weekend_nights": int(weekend),
-            "stays_week_nights": int(week),
-            "adults": int(adults),
-            "children": int(children),
-            "previous_cancellations": int(prev_cancel),
-            "booking_changes": int(changes),
-            "deposit_type": deposit,
-            "market_segment": segment,
-        }
-
-        # Load model or fallback
-        pre = load_preprocessor()
-        model_info = load_trained_model()
-
-        if pre and model_info:
-            try:
-                mtype, model = model_info
-                X = pd.DataFrame([row])
+# Fragment: submitting the form reruns only this section, not the whole page
+@st.fragment
+def predict_section():
+    col_left, col_right = st.columns([2, 1])
+
+    # ------------------ LEFT: FORM ------------------
+    with col_left:
+        st.markdown('<div class="panel">', unsafe_allow_html=True)
+        st.subheader("Booking details")
+
+        with st.form("predict_form"):
+            c1, c2 = st.columns(2)
+            with c1:
+                lead_time = st.number_input("Lead time (days)", 0, 2000, 30)
+                weekend = st.number_input("Weekend nights", 0, 30, 0)
+                week = st.number_input("Week nights", 0, 365, 2)
+            with c2:
+                prev_cancel = st.number_input("Previous cancellations", 0, 50, 0)
+                changes = st.number_input("Booking changes", 0, 50, 0)
+                deposit = st.selectbox("Deposit type", ["No Deposit","Refundable","Non Refund"])
+
+            g1, g2 = st.columns(2)
+            with g1:
+                adults = st.number_input("Adults", 0, 10, 2)
+                children = st.number_input("Children", 0, 10, 0)
+            with g2:
+                segment = st.selectbox("Market segment",
+                                       ["Direct","Online TA","Offline TA/TO","Groups","Corporate","Complementary","Aviation"])
+
+            submit = st.form_submit_button("Predict")
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ------------------ RIGHT: RESULT PANEL ------------------
+    with col_right:
+        st.markdown('<div class="panel">', unsafe_allow_html=True)
+        st.subheader("Prediction")
+
+        if submit:
+            row = {
+                "lead_time": int(lead_time),
+                "stays_weekend_nights": int(weekend),
+                "stays_week_nights": int(week),
+                "adults": int(adults),
+                "children": int(children),
+                "previous_cancellations": int(prev_cancel),
+                "booking_changes": int(changes),
+                "deposit_type": deposit,
+                "market_segment": segment,
+            }
+
+            if pre is None and os.path.exists(PREPROC_PATH):
+                st.warning("Preprocessor failed to load.")
+
+            # Model or fallback
+            if pre and model_info:
                 try:
-                    Xp = pre.transform(X)
-                except:
-                    Xp = X
-                if mtype == "keras":
-                    pred = model.predict(Xp)
-                    prob = float(pred[0][1] if pred.ndim == 2 else pred[0])
-                else:
+                    mtype, model = model_info
+                    X = pd.DataFrame([row])
                     try:
-                        prob = float(model.predict_proba(Xp)[0][1])
+                        Xp = pre.transform(X)
                     except:
-                        prob = float(model.predict(Xp)[0])
-            except:
+                        Xp = X
+                    if mtype == "keras":
+                        if hasattr(Xp, "toarray"):
+                            Xp = Xp.toarray()
+                        # Direct call skips predict()'s per-call batching setup
+                        pred = model(np.asarray(Xp, dtype=np.float32), training=False).numpy()
+                        prob = float(pred[0][1] if pred.ndim == 2 else pred[0])
+                    else:
+                        try:
+                            prob = float(model.predict_proba(Xp)[0][1])
+                        except:
+                            prob = float(model.predict(Xp)[0])
+                except:
+                    prob = heuristic_predict(row)
+            else:
                 prob = heuristic_predict(row)
+
+            label = "Cancelled" if prob >= 0.5 else "Not cancelled"
+
+            # Metric
+            st.metric("Cancellation probability", f"{prob:.2%}")
+
+            # Donut gauge
+            st.markdown(_gauge_svg(prob), unsafe_allow_html=True)
+
+            # Result label
+            if label == "Cancelled":
+                st.error("Prediction: CANCELLED")
+            else:
+                st.success("Prediction: NOT CANCELLED")
+
         else:
-            prob = heuristic_predict(row)
-
-        label = "Cancelled" if prob >= 0.5 else "Not cancelled"
-
-        # Metric
-        st.metric("Cancellation probability", f"{prob:.2%}")
-
-        # Donut gauge
-        fig = go.Figure(go.Pie(
-            values=[prob, 1-prob],
-            hole=0.65,
-            marker_colors=["#ef4444", "#10b981"],
-            hoverinfo="label+percent",
-            textinfo="none"
-        ))
-        fig.update_layout(showlegend=False, margin=dict(t=10,b=10,l=10,r=10),
-                          height=250,
-                          annotations=[dict(text=f"{prob:.0%}", x=0.5,y=0.5,
-                                            font_size=28, showarrow=False)])
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Result label
-        if label == "Cancelled":
-            st.error("Prediction: CANCELLED")
-        else:
-            st.success("Prediction: NOT CANCELLED")
+            st.info("Fill the form and click Predict.")
+
+        st.markdown("</div>", unsafe_allow_html=True)
 
-    else:
-        st.info("Fill the form and click Predict.")
 
-    st.markdown("</div>", unsafe_allow_html=True)
+predict_section()
 
 
 # ------------------ SIGNATURE ------------------